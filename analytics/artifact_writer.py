@@ -0,0 +1,154 @@
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ArtifactWriter:
+    """
+    This class writes the CSV and HTML artifacts on background threads so the calculations do not wait on the disk.
+
+    Artifacts are serialized by the caller and handed over as bytes, so later changes to a DataFrame or figure
+    cannot leak into a file. When the artifacts waiting to be written exceed max_pending_bytes, submit() blocks
+    until the writers catch up. Every file is written atomically: it only appears once it is complete, and
+    repeated writes to the same path land in the order they were submitted.
+
+    Parameters:
+    max_workers (int): The number of writer threads.
+    max_pending_bytes (int): The memory budget for artifacts that are queued but not yet written.
+
+    Example usage:
+    with ArtifactWriter() as writer:
+        borda_count_calculation(writer=writer)
+    """
+
+    def __init__(self, max_workers=4, max_pending_bytes=256 * 1024 * 1024):
+        self.max_pending_bytes = max_pending_bytes
+        self.written_files = []
+        self.failures = []
+        self._pending_bytes = 0
+        self._last_writes = {}
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='artifact-writer')
+
+    def submit(self, path, content):
+        """
+        Queues bytes to be written to path, blocking while the memory budget is used up.
+        """
+
+        size = len(content)
+        with self._condition:
+            # A single artifact larger than the budget is accepted once nothing else is pending
+            while self._pending_bytes and self._pending_bytes + size > self.max_pending_bytes:
+                self._condition.wait()
+            self._pending_bytes += size
+
+        # Writes to the same path wait for the previous one so the last submitted content wins
+        previous_write = self._last_writes.get(path)
+        self._last_writes[path] = self._executor.submit(self._write, path, content, previous_write)
+
+    def close(self):
+        """
+        Waits until every queued artifact is written.
+
+        Returns:
+        - The list of written files.
+        """
+
+        self._executor.shutdown(wait=True)
+
+        if self.failures:
+            details = '; '.join(f'{path}: {error}' for path, error in self.failures)
+            raise RuntimeError(f'Failed to write {len(self.failures)} artifact(s): {details}')
+
+        return self.written_files
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Do not hide an exception raised by the calculations behind a write failure
+        if exc_type is None:
+            self.close()
+        else:
+            self._executor.shutdown(wait=True)
+
+    def _write(self, path, content, previous_write):
+        try:
+            if previous_write is not None:
+                previous_write.result()
+            write_atomically(path, content)
+            self.written_files.append(path)
+        except Exception as error:
+            self.failures.append((path, error))
+        finally:
+            with self._condition:
+                self._pending_bytes -= len(content)
+                self._condition.notify_all()
+
+
+def write_atomically(path, content):
+    """
+    This function writes bytes to a temporary file next to path and then renames it into place.
+
+    Parameters:
+    path (str): The destination file.
+    content (bytes): The data to write.
+    """
+
+    folder = os.path.dirname(path) or '.'
+    os.makedirs(folder, exist_ok=True)
+
+    # Created like a plain open() would create it, so the process umask applies without being changed
+    temporary_path = os.path.join(folder, f'.{os.path.basename(path)}.{uuid.uuid4().hex}.tmp')
+    file_descriptor = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        with os.fdopen(file_descriptor, 'wb') as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+
+        # Keep the permissions of the file being replaced
+        try:
+            os.chmod(temporary_path, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def write_csv(df, path, writer=None, **to_csv_kwargs):
+    """
+    This function saves a DataFrame as CSV, in the background when a writer is given.
+
+    Parameters:
+    df (DataFrame): The data to save.
+    path (str): The destination file.
+    writer (ArtifactWriter): Optional background writer.
+    to_csv_kwargs: Further arguments for DataFrame.to_csv, e.g. index=False.
+    """
+
+    _write_or_submit(path, df.to_csv(**to_csv_kwargs).encode('utf-8'), writer)
+
+
+def write_html(fig, path, writer=None):
+    """
+    This function saves a plotly figure as a standalone HTML file, in the background when a writer is given.
+
+    Parameters:
+    fig (Figure): The figure to save.
+    path (str): The destination file.
+    writer (ArtifactWriter): Optional background writer.
+    """
+
+    _write_or_submit(path, fig.to_html().encode('utf-8'), writer)
+
+
+def _write_or_submit(path, content, writer):
+    if writer is None:
+        write_atomically(path, content)
+    else:
+        writer.submit(path, content)
@@ -0,0 +1,118 @@
+import pandas as pd
+import os
+from concurrent.futures import ProcessPoolExecutor
+from analytics.artifact_writer import ArtifactWriter, write_csv
+from analytics.validation import load_survey_data
+from analytics.borda_count import borda_count_calculation
+from analytics.clarke_groves import clark_groves_mechanism_calculation
+from analytics.range_voting import range_voting_calculation
+from analytics.majority_judgment_calculation_adjusted import majority_judgment_calculation
+from analytics.preferred_project import preferred_project_votes_calculation
+from analytics.knapsack_voting import knapsack_voting_calculation
+from analytics.preference_approval import preference_approval_voting_calculation
+
+# Mechanisms run on every survey file, in the same order as main.py
+MECHANISMS = {
+    'borda_count': borda_count_calculation,
+    'clarke_groves': clark_groves_mechanism_calculation,
+    'range_voting': range_voting_calculation,
+    'majority_judgment': majority_judgment_calculation,
+    'preferred_project': preferred_project_votes_calculation,
+    'knapsack_voting': knapsack_voting_calculation,
+    'preference_approval': preference_approval_voting_calculation,
+}
+
+# Metrics that cannot be pooled by summing them over the surveys
+NON_ADDITIVE_METRICS = ['Average Rank']
+
+
+def batch_calculation(input_path, output_folder='analytics/scriptResults/batch', max_workers=None):
+    """
+    This function runs every mechanism on many survey files in parallel.
+
+    Parameters:
+    input_path (str): A directory containing survey JSON files, or a manifest file listing one survey file per line.
+    output_folder (str): The directory where the results will be saved, with one sub-folder per survey.
+    max_workers (int): The number of worker processes (defaults to the number of CPUs).
+
+    Outputs:
+    - One sub-folder per survey with the CSV and HTML files of every mechanism, its quarantined rows and corrected answers.
+    - A CSV file with the results of all surveys in long format (survey x mechanism x project).
+    - A CSV file with the pooled results, summed over all surveys.
+
+    Returns:
+    - A DataFrame with the results of all surveys in long format.
+    """
+
+    survey_files = _list_survey_files(input_path)
+
+    # Surveys are identified by their file name, so the names must not clash
+    survey_names = [os.path.splitext(os.path.basename(survey_file))[0] for survey_file in survey_files]
+    duplicates = sorted({name for name in survey_names if survey_names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Survey file names must be unique, found duplicates: {', '.join(duplicates)}")
+
+    # Ensure the output directory exists
+    os.makedirs(output_folder, exist_ok=True)
+
+    # Every worker loads its survey once and runs all mechanisms on it
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        survey_results = list(executor.map(_process_survey_file,
+                                           survey_files,
+                                           survey_names,
+                                           [output_folder] * len(survey_files)))
+
+    combined_results = pd.concat(survey_results, ignore_index=True)
+
+    # Save the combined results to the output folder
+    write_csv(combined_results, os.path.join(output_folder, 'batch_results.csv'), index=False)
+
+    # Pool the additive metrics (totals and counts) over all surveys
+    pooled_results = combined_results[~combined_results['Metric'].isin(NON_ADDITIVE_METRICS)]
+    pooled_results = pooled_results.groupby(['Mechanism', 'Project', 'Metric'], sort=False)['Value'].sum().reset_index()
+    write_csv(pooled_results, os.path.join(output_folder, 'batch_pooled_results.csv'), index=False)
+
+    return combined_results
+
+
+def _list_survey_files(input_path):
+    """
+    Returns the survey files of a directory, or the files listed in a manifest (relative to the manifest).
+    """
+
+    if os.path.isdir(input_path):
+        return sorted(os.path.join(input_path, name) for name in os.listdir(input_path) if name.endswith('.json'))
+
+    manifest_folder = os.path.dirname(input_path)
+    with open(input_path, encoding='utf-8') as manifest:
+        entries = [line.strip() for line in manifest]
+
+    # Blank lines and comments are ignored
+    return [os.path.join(manifest_folder, entry) for entry in entries if entry and not entry.startswith('#')]
+
+
+def _process_survey_file(input_file, survey_name, output_folder):
+    """
+    Loads one survey file and runs every mechanism on it, returning the results in long format.
+    """
+
+    survey_folder = os.path.join(output_folder, survey_name)
+    survey_results = []
+
+    # The survey's files are written in the background while its mechanisms keep computing
+    with ArtifactWriter() as writer:
+        data = load_survey_data(input_file, quarantine_file=os.path.join(survey_folder, 'quarantined_rows.csv'),
+                                corrections_file=os.path.join(survey_folder, 'corrected_values.csv'), writer=writer)
+
+        for mechanism, calculation in MECHANISMS.items():
+            # Mechanisms add helper columns to the data, so each one gets its own copy
+            results = calculation(output_folder=survey_folder, data=data.copy(), writer=writer)
+            results = results.melt(id_vars='Project', var_name='Metric', value_name='Value')
+            results.insert(0, 'Mechanism', mechanism)
+            results.insert(0, 'Survey', survey_name)
+            survey_results.append(results)
+
+    return pd.concat(survey_results, ignore_index=True)
+
+# Example usage:
+# batch_calculation('surveys/')
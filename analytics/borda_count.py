@@ -1,43 +1,51 @@
+import numpy as np
 import pandas as pd
 import os
 import plotly.express as px
+from analytics.chart_scaling import box_plot, dot_plot
+from analytics.validation import load_survey_data, select_valid_rows
+from analytics.codec import encode_labels
+from analytics.artifact_writer import write_csv, write_html
 
-def borda_count_calculation(input_file='survey_data.json', output_folder='analytics/scriptResults', showResults=False):
+def borda_count_calculation(input_file='survey_data.json', output_folder='analytics/scriptResults', showResults=False, data=None, exporter=None, writer=None):
     """
     This function performs a Borda Count calculation on survey data.
 
     Parameters:
     input_file (str): The path to the JSON file containing the survey data.
     output_folder (str): The directory where the results will be saved.
+    showResults (bool): Whether to open the charts after saving them.
+    data (DataFrame): Survey data as returned by load_survey_data; when given, input_file is not read.
+    exporter (ImageExporter): Optional exporter that also renders the charts to PNG and SVG images.
+    writer (ArtifactWriter): Optional background writer for the CSV and HTML files (written synchronously otherwise).
 
     Outputs:
     - A CSV file with the total Borda points for each project.
     - HTML files with a bar chart, dot plot, heatmap, and box plot visualizing the Borda Count results.
+    - A CSV file with the rows rejected by validation and the reasons they were rejected.
+    - A CSV file with the answers corrected by validation and the reasons they were corrected.
+
+    Returns:
+    - A DataFrame with the total Borda points for each project.
     """
 
-    # Load the data
-    data = pd.read_json(input_file)
+    # Load and validate the data (rejected rows and corrected answers are written to their own files)
+    if data is None:
+        data = load_survey_data(input_file, quarantine_file=os.path.join(output_folder, 'quarantined_rows.csv'),
+                                corrections_file=os.path.join(output_folder, 'corrected_values.csv'), writer=writer)
+
+    # Keep the respondents whose project rankings are valid
+    data = select_valid_rows(data, ['ranks'])
 
     # Filter columns that start with 'project_preference_'
     preference_columns = [col for col in data.columns if col.startswith('project_preference_')]
 
-    # Initialize a dictionary to hold the Borda count scores
-    borda_scores = {}
-
     # Maximum points calculation (in Borda, lower rank gets more points)
     max_points = len(preference_columns)
 
-    # Iterate through each row to calculate Borda points
-    for _, row in data[preference_columns].iterrows():
-        for col in preference_columns:
-            project_name = col.replace('project_preference_', '')  # Extract the project name from the column
-            rank = int(row[col])  # The rank is the value in the cell
-
-            if project_name not in borda_scores:
-                borda_scores[project_name] = 0
-
-            # Calculate the points based on the rank (inversely proportional)
-            borda_scores[project_name] += (max_points - rank + 1)
+    # Calculate the points based on the rank (inversely proportional) and sum them per project
+    borda_points = (max_points - data[preference_columns] + 1).sum()
+    borda_scores = {col.replace('project_preference_', ''): points for col, points in borda_points.items()}
 
     # Convert the borda_scores dictionary to a DataFrame
     borda_scores_df = pd.DataFrame.from_dict(borda_scores, orient='index', columns=['Total Points']).sort_values(
@@ -51,7 +59,7 @@ def borda_count_calculation(input_file='survey_data.json', output_folder='analyt
     borda_scores_df.columns = ['Project', 'Total Points']  # Rename columns for clarity
 
     # Save the results to the output folder
-    borda_scores_df.to_csv(os.path.join(output_folder, 'borda_count_results.csv'))
+    write_csv(borda_scores_df, os.path.join(output_folder, 'borda_count_results.csv'), writer)
 
     # Plotting with Plotly - Bar Chart
     fig_bar = px.bar(borda_scores_df,
@@ -61,31 +69,29 @@ def borda_count_calculation(input_file='survey_data.json', output_folder='analyt
                      title='Chart 1: Borda Count Results')
 
     # Save the bar chart as an HTML file
-    fig_bar.write_html(os.path.join(output_folder, 'borda_count_results_bar_plot.html'))
+    write_html(fig_bar, os.path.join(output_folder, 'borda_count_results_bar_plot.html'), writer)
 
     # Plotting with Plotly - Dot Plot
     # We need to reshape the data to show ranks across projects
-    rank_data = []
-    for _, row in data[preference_columns].iterrows():
-        for col in preference_columns:
-            project_name = col.replace('project_preference_', '')
-            rank = int(row[col])
-            rank_data.append({'Project': project_name, 'Rank': rank})
-
-    rank_df = pd.DataFrame(rank_data)
+    # Stacking keeps the respondent-by-respondent order of the ranks
+    rank_df = data[preference_columns].stack().reset_index(level=1)
+    rank_df.columns = ['Project', 'Rank']
+    rank_df['Project'] = rank_df['Project'].str.replace('project_preference_', '')
+    rank_df = rank_df.reset_index(drop=True)
 
     # Adding a small random noise to the Rank to create a jitter effect manually
     rank_df['Jittered Rank'] = rank_df['Rank'] + (pd.Series(rank_df.index).mod(2) * 0.1)
 
-    fig_dot = px.scatter(rank_df,
-                         x='Project',
-                         y='Jittered Rank',
-                         labels={'Project': 'Project', 'Jittered Rank': 'Rank'},
-                         title='Chart 2: Distribution of Ranks for Each Project',
-                         )
+    # Large electorates are binned into WebGL markers instead of one point per rank
+    fig_dot = dot_plot(rank_df,
+                       x='Project',
+                       y='Jittered Rank',
+                       labels={'Project': 'Project', 'Jittered Rank': 'Rank'},
+                       title='Chart 2: Distribution of Ranks for Each Project',
+                       )
 
     # Save the dot plot as an HTML file
-    fig_dot.write_html(os.path.join(output_folder, 'borda_count_results_dot_plot.html'))
+    write_html(fig_dot, os.path.join(output_folder, 'borda_count_results_dot_plot.html'), writer)
 
     # Plotting with Plotly - Heatmap
     heatmap_data = rank_df.pivot_table(index='Project', columns='Rank', aggfunc='size', fill_value=0)
@@ -97,38 +103,46 @@ def borda_count_calculation(input_file='survey_data.json', output_folder='analyt
     )
 
     # Save the heatmap as an HTML file
-    fig_heatmap.write_html(os.path.join(output_folder, 'borda_count_results_heatmap.html'))
+    write_html(fig_heatmap, os.path.join(output_folder, 'borda_count_results_heatmap.html'), writer)
 
     # Prepare data for the box plot
+    # The sentiment split only uses respondents whose opinion on the factory is a known answer
+    sentiment_data = select_valid_rows(data, ['opinion_on_tesla_factory_presence'])
+
     # Assign numeric values to sentiment levels
-    data['sentiment_category'] = data['opinion_on_tesla_factory_presence'].apply(
-        lambda x: 'Positive' if x in ["Sehr positiv.", "Eher positiv.", "Neutral."] else 'Negative')
+    positive_codes = encode_labels('opinion_on_tesla_factory_presence', ["Sehr positiv.", "Eher positiv.", "Neutral."])
+    sentiment_data['sentiment_category'] = np.where(sentiment_data['opinion_on_tesla_factory_presence'].isin(positive_codes),
+                                                    'Positive', 'Negative')
 
     # Prepare data for the box plot
     box_plot_data = pd.DataFrame()
 
     for col in preference_columns:
         project_name = col.replace('project_preference_', '')
-        data.loc[:, f'{project_name}_Contribution'] = data[col].apply(lambda rank: max_points - int(rank) + 1)
+        sentiment_data.loc[:, f'{project_name}_Contribution'] = max_points - sentiment_data[col] + 1
 
         # Add the contribution and sentiment category to the box plot data
-        project_data = data[[f'{project_name}_Contribution', 'sentiment_category']].copy()
+        project_data = sentiment_data[[f'{project_name}_Contribution', 'sentiment_category']].copy()
         project_data.columns = ['Contribution', 'Sentiment']
         project_data['Project'] = project_name
 
         box_plot_data = pd.concat([box_plot_data, project_data], axis=0)
 
-    # Create the box plot
-    fig_box = px.box(box_plot_data,
-                     x='Project',
-                     y='Contribution',
-                     color='Sentiment',
-                     labels={'Contribution': 'Contribution', 'Project': 'Project'},
-                     title='Chart 15: Contribution Comparison by Sentiment for Each Project'
-                     )
+    # Create the box plot (precomputed quartiles for large electorates)
+    fig_box = box_plot(box_plot_data,
+                       x='Project',
+                       y='Contribution',
+                       color='Sentiment',
+                       labels={'Contribution': 'Contribution', 'Project': 'Project'},
+                       title='Chart 15: Contribution Comparison by Sentiment for Each Project'
+                       )
 
     # Save the box plot as an HTML file
-    fig_box.write_html(os.path.join(output_folder, 'borda_count_results_box_plot.html'))
+    write_html(fig_box, os.path.join(output_folder, 'borda_count_results_box_plot.html'), writer)
+
+    # Queue the charts for static image export
+    if exporter is not None:
+        exporter.submit(fig_bar, fig_dot, fig_heatmap, fig_box)
 
     # Display the plots (Optional for local testing)
     if showResults:
@@ -137,5 +151,7 @@ def borda_count_calculation(input_file='survey_data.json', output_folder='analyt
         fig_heatmap.show()
         fig_box.show()
 
+    return borda_scores_df
+
 # Example usage:
 # borda_count_calculation()
\ No newline at end of file
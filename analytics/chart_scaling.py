@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Above this many plotted points the charts switch to pre-aggregated traces
+LARGE_CHART_THRESHOLD = 20000
+
+
+def box_plot(data, x, y, color=None, labels=None, title=None, max_points=LARGE_CHART_THRESHOLD):
+    """
+    This function creates a box plot that stays small regardless of the number of respondents.
+
+    Parameters:
+    data (DataFrame): Long-format data with one row per plotted value.
+    x (str): The column holding the categories on the x-axis.
+    y (str): The column holding the values to summarise.
+    color (str): Optional column used to split each category into grouped boxes.
+    labels (dict): Axis labels, as accepted by plotly express.
+    title (str): The chart title.
+    max_points (int): Up to this many rows the raw values are plotted with plotly express.
+
+    Returns:
+    - A plotly Figure. Above max_points the boxes are drawn from precomputed quartiles and fences,
+      so the payload only grows with the number of categories.
+    """
+
+    # Small data: keep the exact plotly express rendering
+    if len(data) <= max_points:
+        return px.box(data, x=x, y=y, color=color, labels=labels, title=title)
+
+    labels = labels or {}
+    fig = go.Figure()
+
+    # One box trace per color group, mirroring what plotly express produces
+    groups = data.groupby(color, sort=False) if color else [(None, data)]
+    outliers = []
+
+    # Boxes and their outliers share a color, as in plotly express
+    colors = px.colors.qualitative.Plotly
+
+    for group_index, (group_name, group_data) in enumerate(groups):
+        color_value = colors[group_index % len(colors)]
+        stats = _box_statistics(group_data, x, y)
+        fig.add_trace(go.Box(
+            x=stats.index,
+            q1=stats['q1'],
+            median=stats['median'],
+            q3=stats['q3'],
+            lowerfence=stats['lowerfence'],
+            upperfence=stats['upperfence'],
+            name=str(group_name) if color else '',
+            offsetgroup=str(group_name) if color else None,
+            legendgroup=str(group_name) if color else None,
+            showlegend=bool(color),
+            marker_color=color_value
+        ))
+
+        # Keep track of the values beyond the fences so they can be drawn as points
+        fences = stats.loc[group_data[x], ['lowerfence', 'upperfence']].to_numpy()
+        values = group_data[y].to_numpy()
+        outside = (values < fences[:, 0]) | (values > fences[:, 1])
+        outliers.append((group_name, color_value, group_data.loc[outside, [x, y]]))
+
+    # Outliers are raw points, so only draw them while they remain few. Grouped outliers must sit over
+    # their own box, which needs offsetgroup; WebGL traces do not support it, so they are only used without color
+    if sum(len(points) for _, _, points in outliers) <= max_points:
+        for group_name, color_value, points in outliers:
+            if not points.empty:
+                scatter = go.Scatter if color else go.Scattergl
+                fig.add_trace(scatter(
+                    x=points[x],
+                    y=points[y],
+                    mode='markers',
+                    name=str(group_name) if color else '',
+                    legendgroup=str(group_name) if color else None,
+                    showlegend=False,
+                    marker=dict(color=color_value),
+                    **({'offsetgroup': str(group_name)} if color else {})
+                ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title=labels.get(x, x),
+        yaxis_title=labels.get(y, y),
+        legend_title_text=labels.get(color, color) if color else None,
+        boxmode='group',
+        scattermode='group'
+    )
+
+    return fig
+
+
+def dot_plot(data, x, y, labels=None, title=None, max_points=LARGE_CHART_THRESHOLD):
+    """
+    This function creates a dot plot that stays small regardless of the number of respondents.
+
+    Parameters:
+    data (DataFrame): Long-format data with one row per plotted point.
+    x (str): The column holding the categories on the x-axis.
+    y (str): The column holding the values on the y-axis.
+    labels (dict): Axis labels, as accepted by plotly express.
+    title (str): The chart title.
+    max_points (int): Up to this many rows every point is plotted with plotly express.
+
+    Returns:
+    - A plotly Figure. Above max_points identical (x, y) points are binned into one WebGL marker
+      whose size reflects how many respondents it represents.
+    """
+
+    # Small data: keep the exact plotly express rendering
+    if len(data) <= max_points:
+        return px.scatter(data, x=x, y=y, labels=labels, title=title)
+
+    labels = labels or {}
+
+    # Bin identical points and count them
+    binned = data.groupby([x, y], sort=False).size().reset_index(name='Count')
+    marker_size = 4 + 16 * np.sqrt(binned['Count'] / binned['Count'].max())
+
+    fig = go.Figure(go.Scattergl(
+        x=binned[x],
+        y=binned[y],
+        mode='markers',
+        marker=dict(size=marker_size),
+        customdata=binned['Count'],
+        hovertemplate=f'{labels.get(x, x)}=%{{x}}<br>{labels.get(y, y)}=%{{y}}<br>Count=%{{customdata}}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title=labels.get(x, x),
+        yaxis_title=labels.get(y, y)
+    )
+
+    return fig
+
+
+def _box_statistics(data, x, y):
+    """
+    Computes quartiles and Tukey fences (clipped to the data, as plotly does) for each category.
+    """
+
+    grouped = data.groupby(x, sort=False)[y]
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ['q1', 'median', 'q3']
+
+    # Fences are the most extreme values still within 1.5 IQR of the box
+    iqr = stats['q3'] - stats['q1']
+    lower_limit = (stats['q1'] - 1.5 * iqr).loc[data[x]].to_numpy()
+    upper_limit = (stats['q3'] + 1.5 * iqr).loc[data[x]].to_numpy()
+    values = data[y].to_numpy()
+
+    stats['lowerfence'] = pd.Series(np.where(values >= lower_limit, values, np.nan), index=data.index).groupby(data[x], sort=False).min()
+    stats['upperfence'] = pd.Series(np.where(values <= upper_limit, values, np.nan), index=data.index).groupby(data[x], sort=False).max()
+
+    return stats
@@ -1,14 +1,22 @@
 import pandas as pd
 import os
 import plotly.express as px
+from analytics.chart_scaling import box_plot
+from analytics.validation import load_survey_data, select_valid_rows
+from analytics.codec import encode_labels, lookup_table
+from analytics.artifact_writer import write_csv, write_html
 
-def clark_groves_mechanism_calculation(input_file='survey_data.json', output_folder='analytics/scriptResults', showResults=False):
+def clark_groves_mechanism_calculation(input_file='survey_data.json', output_folder='analytics/scriptResults', showResults=False, data=None, exporter=None, writer=None):
     """
     This function performs a Clark-Groves Mechanism calculation on survey data.
 
     Parameters:
     input_file (str): The path to the JSON file containing the survey data.
     output_folder (str): The directory where the results will be saved.
+    showResults (bool): Whether to open the charts after saving them.
+    data (DataFrame): Survey data as returned by load_survey_data; when given, input_file is not read.
+    exporter (ImageExporter): Optional exporter that also renders the charts to PNG and SVG images.
+    writer (ArtifactWriter): Optional background writer for the CSV and HTML files (written synchronously otherwise).
 
     Outputs:
     - A CSV file with the total support for each project.
@@ -16,10 +24,20 @@ def clark_groves_mechanism_calculation(input_file='survey_data.json', output_fol
     - An HTML file with a box plot visualizing the distribution of support for each project.
     - An HTML file with a bubble chart visualizing the relationship between average income, points from opinion columns, and average support.
     - A CSV file containing all the data used for the bubble chart.
+    - A CSV file with the rows rejected by validation and the reasons they were rejected.
+    - A CSV file with the answers corrected by validation and the reasons they were corrected.
+
+    Returns:
+    - A DataFrame with the total support for each project.
     """
 
-    # Load the data
-    data = pd.read_json(input_file)
+    # Load and validate the data (rejected rows and corrected answers are written to their own files)
+    if data is None:
+        data = load_survey_data(input_file, quarantine_file=os.path.join(output_folder, 'quarantined_rows.csv'),
+                                corrections_file=os.path.join(output_folder, 'corrected_values.csv'), writer=writer)
+
+    # Keep the respondents whose supports are valid
+    data = select_valid_rows(data, ['supports'])
 
     # Filter columns that end with '_support'
     support_columns = [col for col in data.columns if col.endswith('_support')]
@@ -44,7 +62,7 @@ def clark_groves_mechanism_calculation(input_file='survey_data.json', output_fol
     os.makedirs(output_folder, exist_ok=True)
 
     # Save the results to the output folder
-    total_support_df.to_csv(os.path.join(output_folder, 'clark_groves_mechanism_results.csv'), index=False)
+    write_csv(total_support_df, os.path.join(output_folder, 'clark_groves_mechanism_results.csv'), writer, index=False)
 
     # Plotting Bar Chart with Plotly
     fig_bar = px.bar(total_support_df,
@@ -54,21 +72,21 @@ def clark_groves_mechanism_calculation(input_file='survey_data.json', output_fol
                      title='Chart 4: Clark-Groves Mechanism: Total Support per Project')
 
     # Save the bar chart as an HTML file
-    fig_bar.write_html(os.path.join(output_folder, 'clark_groves_mechanism_results_plot.html'))
+    write_html(fig_bar, os.path.join(output_folder, 'clark_groves_mechanism_results_plot.html'), writer)
 
     # Prepare data for Box Plot
     box_plot_data = pd.melt(data[support_columns], var_name='Project', value_name='Support (€)')
     box_plot_data['Project'] = box_plot_data['Project'].str.replace('_support', '')
 
-    # Plotting Box Plot with Plotly
-    fig_box = px.box(box_plot_data,
-                     x='Project',
-                     y='Support (€)',
-                     labels={'Project': 'Project', 'Support (€)': 'Support (€)'},
-                     title='Chart 5: Clark-Groves Mechanism: Distribution of Support per Project')
+    # Plotting Box Plot with Plotly (precomputed quartiles for large electorates)
+    fig_box = box_plot(box_plot_data,
+                       x='Project',
+                       y='Support (€)',
+                       labels={'Project': 'Project', 'Support (€)': 'Support (€)'},
+                       title='Chart 5: Clark-Groves Mechanism: Distribution of Support per Project')
 
     # Save the box plot as an HTML file
-    fig_box.write_html(os.path.join(output_folder, 'clark_groves_mechanism_box_plot.html'))
+    write_html(fig_box, os.path.join(output_folder, 'clark_groves_mechanism_box_plot.html'), writer)
 
     # Calculate average income, points from opinion columns, and average support
     income_column = 'annual_income'  # Assuming this is the column for income
@@ -84,21 +102,26 @@ def clark_groves_mechanism_calculation(input_file='survey_data.json', output_fol
         "• 100.000 € oder mehr": 110000,
         "• Bevorzuge keine Angabe": None
     }
-    data['income_numeric'] = data[income_column].map(income_mapping)
+    # Income codes index directly into the lookup table (missing answers map to NaN)
+    data['income_numeric'] = lookup_table(income_column, income_mapping)[data[income_column]]
+
+    # The bubble chart also needs valid project and opinion ratings and a known income answer
+    bubble_rows = select_valid_rows(data, ['ratings', 'opinions', income_column])
 
     bubble_data = []
 
     for col in support_columns:
         project_name = col.replace('_support', '')
         rating_col = f'project_rating_{project_name}'
-        supporting_data = data[data[rating_col] != 'Inakzeptabel.']  # Filter supporters
+        unacceptable_code, = encode_labels(rating_col, ['Inakzeptabel.'])
+        supporting_data = bubble_rows[bubble_rows[rating_col] != unacceptable_code]  # Filter supporters
         avg_income = supporting_data['income_numeric'].mean()  # Calculate average income of supporters
         opinion_col = f'opinion_{project_name}_rating'
         if opinion_col in data.columns:
-            total_opinion_points = data[opinion_col].sum()  # Total points from the relevant opinion column
+            total_opinion_points = bubble_rows[opinion_col].sum()  # Total points from the relevant opinion column
         else:
             total_opinion_points = 0
-        avg_support = data[col].mean()
+        avg_support = bubble_rows[col].mean()
 
         bubble_data.append({
             'Project': project_name,
@@ -111,7 +134,7 @@ def clark_groves_mechanism_calculation(input_file='survey_data.json', output_fol
     bubble_data_df = pd.DataFrame(bubble_data)
 
     # Save the bubble data to a CSV file
-    bubble_data_df.to_csv(os.path.join(output_folder, 'clark_groves_mechanism_bubble_data.csv'), index=False)
+    write_csv(bubble_data_df, os.path.join(output_folder, 'clark_groves_mechanism_bubble_data.csv'), writer, index=False)
 
     # Plotting Bubble Chart with Plotly
     fig_bubble = px.scatter(bubble_data_df,
@@ -126,7 +149,11 @@ def clark_groves_mechanism_calculation(input_file='survey_data.json', output_fol
                             title='Chart 6: Clark-Groves Mechanism: Bubble Chart of Average Income vs. Opinion Points')
 
     # Save the bubble chart as an HTML file
-    fig_bubble.write_html(os.path.join(output_folder, 'clark_groves_mechanism_bubble_chart.html'))
+    write_html(fig_bubble, os.path.join(output_folder, 'clark_groves_mechanism_bubble_chart.html'), writer)
+
+    # Queue the charts for static image export
+    if exporter is not None:
+        exporter.submit(fig_bar, fig_box, fig_bubble)
 
     # Display the plots (Optional for local testing)
     if showResults:
@@ -134,5 +161,7 @@ def clark_groves_mechanism_calculation(input_file='survey_data.json', output_fol
         fig_box.show()
         fig_bubble.show()
 
+    return total_support_df
+
 # Example usage:
 # clark_groves_mechanism_calculation()
\ No newline at end of file
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from common_fields import common_fields  # Importing common_fields from common_fields.py
+
+# Code of a missing or unknown answer
+MISSING_CODE = -1
+
+
+def column_vocabulary(column):
+    """
+    This function returns the ordered labels that the codes of a categorical column index into.
+
+    Parameters:
+    column (str): The name of the survey column.
+
+    Returns:
+    - The list of labels from common_fields, or None if the column is not categorical.
+    """
+
+    if column.startswith('project_rating_'):
+        return common_fields['project_ratings']
+    if column in common_fields and column != 'projects':
+        return common_fields[column]
+    return None
+
+
+def encode_survey_data(data):
+    """
+    This function replaces every categorical text column with compact int8 codes.
+
+    Parameters:
+    data (DataFrame): The validated survey data.
+
+    Returns:
+    - A DataFrame in which each categorical answer is the position of its label in column_vocabulary(),
+      and missing answers are MISSING_CODE.
+    """
+
+    encoded_data = data.copy()
+
+    for col in data.columns:
+        vocabulary = column_vocabulary(col)
+        if vocabulary is not None:
+            # Categorical codes are the positions in the vocabulary, with -1 for missing answers
+            codes = pd.Categorical(data[col], categories=vocabulary).codes
+            encoded_data[col] = codes.astype(np.int8)
+
+    return encoded_data
+
+
+def encode_labels(column, labels):
+    """
+    This function returns the codes of the given labels, for comparisons on encoded columns.
+
+    Parameters:
+    column (str): The name of the survey column.
+    labels (list): The labels to encode.
+
+    Returns:
+    - A list with the int8 code of every label.
+    """
+
+    vocabulary = column_vocabulary(column)
+    return [np.int8(vocabulary.index(label)) for label in labels]
+
+
+def decode_column(column, codes):
+    """
+    This function turns int8 codes back into their labels, for labelling charts and tables.
+
+    Parameters:
+    column (str): The name of the survey column.
+    codes (array-like): The codes to decode.
+
+    Returns:
+    - A Categorical with the labels, where MISSING_CODE becomes NaN.
+    """
+
+    return pd.Categorical.from_codes(np.asarray(codes, dtype=np.int8), categories=column_vocabulary(column))
+
+
+def lookup_table(column, values_by_label, missing_value=np.nan):
+    """
+    This function builds an array that maps codes to values with plain indexing.
+
+    Parameters:
+    column (str): The name of the survey column.
+    values_by_label (dict): The value for each label; labels that are not listed get missing_value.
+    missing_value: The value used for missing answers.
+
+    Returns:
+    - An array indexed by code, whose last element (reached by MISSING_CODE) is missing_value.
+    """
+
+    values = [values_by_label.get(label, missing_value) for label in column_vocabulary(column)]
+    return np.array(values + [missing_value], dtype=float)
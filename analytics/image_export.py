@@ -0,0 +1,131 @@
+import os
+import queue
+import re
+import threading
+import plotly.io as pio
+
+# Report images are named after the "Chart N: ..." titles of the figures
+CHART_TITLE_PATTERN = re.compile(r'^Chart (\d+):')
+
+IMAGE_FORMATS = ('png', 'svg')
+
+# Size of the report images (PNG files are rendered at twice this size, 3024 x 1730 pixels)
+REPORT_IMAGE_WIDTH = 1512
+REPORT_IMAGE_HEIGHT = 865
+REPORT_IMAGE_SCALE = 2
+
+
+class ImageExporter:
+    """
+    This class renders figures to static images on a background thread while the calculations keep running.
+
+    All figures are rendered by one persistent kaleido renderer process, which is started once and reused,
+    instead of paying the browser start-up for every image. A figure titled "Chart N: ..." is written to
+    <output_folder>/<format>/chartN.<format>, e.g. analytics/scriptResults/png/chart1.png.
+
+    Parameters:
+    output_folder (str): The directory that receives one sub-folder per image format.
+    formats (tuple): The image formats to render.
+    width (int): The image width in pixels (defaults to the size of the report images).
+    height (int): The image height in pixels (defaults to the size of the report images).
+    scale (float): The scale factor applied to raster images.
+
+    Example usage:
+    with ImageExporter() as exporter:
+        borda_count_calculation(exporter=exporter)
+    """
+
+    def __init__(self, output_folder='analytics/scriptResults', formats=IMAGE_FORMATS, width=REPORT_IMAGE_WIDTH,
+                 height=REPORT_IMAGE_HEIGHT, scale=REPORT_IMAGE_SCALE):
+        # Fail early if the renderer is not installed
+        try:
+            import kaleido
+        except ImportError as error:
+            raise ImportError('Static image export requires the kaleido package (pip install kaleido).') from error
+
+        self.output_folder = output_folder
+        self.formats = formats
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.written_files = []
+        self.failures = []
+
+        for image_format in formats:
+            os.makedirs(os.path.join(output_folder, image_format), exist_ok=True)
+
+        # A bounded queue keeps the calculations from running far ahead of the renderer
+        self._queue = queue.Queue(maxsize=32)
+        self._worker = threading.Thread(target=self._render_queued_figures, args=(kaleido,), daemon=True)
+        self._worker.start()
+
+    def submit(self, *figures):
+        """
+        Queues figures for rendering; they must not be modified afterwards.
+        """
+
+        for fig in figures:
+            title = fig.layout.title.text or ''
+            match = CHART_TITLE_PATTERN.match(title)
+            if match is None:
+                raise ValueError(f"Cannot derive an image name from the figure title '{title}', expected 'Chart N: ...'.")
+            self._queue.put((f'chart{match.group(1)}', fig))
+
+    def close(self):
+        """
+        Waits until every queued figure is rendered and stops the renderer.
+
+        Returns:
+        - The list of written image files.
+        """
+
+        self._queue.put(None)
+        self._worker.join()
+
+        if self.failures:
+            details = '; '.join(f'{name}: {error}' for name, error in self.failures)
+            raise RuntimeError(f'Failed to export {len(self.failures)} image(s): {details}')
+
+        return self.written_files
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Do not hide an exception raised by the calculations behind an export failure
+        if exc_type is None:
+            self.close()
+        else:
+            self._queue.put(None)
+            self._worker.join()
+
+    def _render_queued_figures(self, kaleido):
+        # Newer kaleido versions only keep the browser alive through an explicit server
+        uses_server = hasattr(kaleido, 'start_sync_server')
+        startup_error = None
+        try:
+            if uses_server:
+                kaleido.start_sync_server(silence_warnings=True)
+        except Exception as error:
+            startup_error = error
+
+        # Keep draining the queue even after errors so that submit() never blocks forever
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            name, fig = item
+            for image_format in self.formats:
+                path = os.path.join(self.output_folder, image_format, f'{name}.{image_format}')
+                try:
+                    if startup_error is not None:
+                        raise startup_error
+                    pio.write_image(fig, path, format=image_format, width=self.width, height=self.height,
+                                    scale=self.scale, engine='kaleido')
+                    self.written_files.append(path)
+                except Exception as error:
+                    self.failures.append((path, error))
+
+        if uses_server and startup_error is None:
+            kaleido.stop_sync_server(silence_warnings=True)
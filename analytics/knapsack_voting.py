@@ -1,8 +1,10 @@
 import pandas as pd
 import os
 import plotly.graph_objects as go
+from analytics.validation import load_survey_data, select_valid_rows
+from analytics.artifact_writer import write_csv, write_html
 
-def knapsack_voting_calculation(input_file='survey_data.json', output_folder='analytics/scriptResults', showResults=False):
+def knapsack_voting_calculation(input_file='survey_data.json', output_folder='analytics/scriptResults', showResults=False, data=None, exporter=None, writer=None):
     """
     This function performs a Knapsack-Voting calculation and overlays the Clark-Groves Mechanism contributions
     as a line chart on a secondary y-axis.
@@ -10,15 +12,30 @@ def knapsack_voting_calculation(input_file='survey_data.json', output_folder='an
     Parameters:
     input_file (str): The path to the JSON file containing the survey data.
     output_folder (str): The directory where the results will be saved.
+    showResults (bool): Whether to open the charts after saving them.
+    data (DataFrame): Survey data as returned by load_survey_data; when given, input_file is not read.
+    exporter (ImageExporter): Optional exporter that also renders the charts to PNG and SVG images.
+    writer (ArtifactWriter): Optional background writer for the CSV and HTML files (written synchronously otherwise).
 
     Outputs:
     - A CSV file with the total votes each project received.
     - A CSV file with the total support each project received from the Clark-Groves Mechanism.
     - An HTML file with a bar chart and line chart visualizing the results.
+    - A CSV file with the rows rejected by validation and the reasons they were rejected.
+    - A CSV file with the answers corrected by validation and the reasons they were corrected.
+
+    Returns:
+    - A DataFrame with the total votes each project received.
     """
 
-    # Load the data
-    data = pd.read_json(input_file)
+    # Load and validate the data (rejected rows and corrected answers are written to their own files)
+    if data is None:
+        data = load_survey_data(input_file, quarantine_file=os.path.join(output_folder, 'quarantined_rows.csv'),
+                                corrections_file=os.path.join(output_folder, 'corrected_values.csv'), writer=writer)
+
+    # Votes and supports are tallied over the respondents whose answers in that column family are valid
+    vote_data = select_valid_rows(data, ['votes'])
+    support_data = select_valid_rows(data, ['supports'])
 
     # Filter columns that start with 'votes_for_'
     vote_columns = [col for col in data.columns if col.startswith('votes_for_')]
@@ -29,7 +46,7 @@ def knapsack_voting_calculation(input_file='survey_data.json', output_folder='an
     # Calculate the total votes for each project
     for col in vote_columns:
         project_name = col.replace('votes_for_', '')  # Extract the project name from the column name
-        total_votes[project_name] = data[col].apply(lambda x: str(x).count('Stimme')).sum()
+        total_votes[project_name] = vote_data[col].str.count('Stimme').sum()
 
     # Convert the total_votes dictionary to a DataFrame
     total_votes_df = pd.DataFrame.from_dict(total_votes, orient='index', columns=['Total Votes']).sort_values(
@@ -48,7 +65,7 @@ def knapsack_voting_calculation(input_file='survey_data.json', output_folder='an
     # Calculate the total support for each project
     for col in support_columns:
         project_name = col.replace('_support', '')  # Extract the project name from the column
-        total_support[project_name] = data[col].sum()  # Sum the support values for each project
+        total_support[project_name] = support_data[col].sum()  # Sum the support values for each project
 
     # Convert the total_support dictionary to a DataFrame
     total_support_df = pd.DataFrame.from_dict(total_support, orient='index', columns=['Total Support (€)'])
@@ -61,8 +78,8 @@ def knapsack_voting_calculation(input_file='survey_data.json', output_folder='an
     os.makedirs(output_folder, exist_ok=True)
 
     # Save the results to the output folder
-    total_votes_df.to_csv(os.path.join(output_folder, 'knapsack_voting_results.csv'))
-    total_support_df.to_csv(os.path.join(output_folder, 'clark_groves_mechanism_results.csv'))
+    write_csv(total_votes_df, os.path.join(output_folder, 'knapsack_voting_results.csv'), writer)
+    write_csv(total_support_df, os.path.join(output_folder, 'clark_groves_mechanism_results.csv'), writer)
 
     # Plotting with Plotly (Bar for Knapsack Voting, Line for Clark-Groves)
     fig = go.Figure()
@@ -108,11 +125,17 @@ def knapsack_voting_calculation(input_file='survey_data.json', output_folder='an
     )
 
     # Save the combined plot as an HTML file
-    fig.write_html(os.path.join(output_folder, 'knapsack_voting_and_clark_groves_results_plot.html'))
+    write_html(fig, os.path.join(output_folder, 'knapsack_voting_and_clark_groves_results_plot.html'), writer)
+
+    # Queue the charts for static image export
+    if exporter is not None:
+        exporter.submit(fig)
 
     # Display the plot (Optional for local testing)
     if showResults:
         fig.show()
 
+    return total_votes_df
+
 # Example usage:
 # knapsack_voting_calculation()
\ No newline at end of file
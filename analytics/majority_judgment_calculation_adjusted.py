@@ -1,10 +1,15 @@
+import numpy as np
 import pandas as pd
 import os
 import plotly.express as px
 import plotly.graph_objects as go
+from analytics.validation import load_survey_data, select_valid_rows
+from common_fields import common_fields  # Importing common_fields from common_fields.py
+from analytics.codec import MISSING_CODE
+from analytics.artifact_writer import write_csv, write_html
 
 
-def majority_judgment_calculation(input_file='survey_data.json', output_folder='analytics/scriptResults', showResults=False):
+def majority_judgment_calculation(input_file='survey_data.json', output_folder='analytics/scriptResults', showResults=False, data=None, exporter=None, writer=None):
     """
     This function performs a Majority Judgment calculation on survey data and visualizes the results
     using both a Diverging Bar Chart and a Box Plot.
@@ -12,15 +17,29 @@ def majority_judgment_calculation(input_file='survey_data.json', output_folder='
     Parameters:
     input_file (str): The path to the JSON file containing the survey data.
     output_folder (str): The directory where the results will be saved.
+    showResults (bool): Whether to open the charts after saving them.
+    data (DataFrame): Survey data as returned by load_survey_data; when given, input_file is not read.
+    exporter (ImageExporter): Optional exporter that also renders the charts to PNG and SVG images.
+    writer (ArtifactWriter): Optional background writer for the CSV and HTML files (written synchronously otherwise).
 
     Outputs:
     - A CSV file with the count of each rating category for each project.
     - An HTML file with a Diverging Bar Chart visualizing the ratings distribution.
     - An HTML file with a Box Plot visualizing the ratings spread for each project.
+    - A CSV file with the rows rejected by validation and the reasons they were rejected.
+    - A CSV file with the answers corrected by validation and the reasons they were corrected.
+
+    Returns:
+    - A DataFrame with the count of each rating category for each project.
     """
 
-    # Load the data
-    data = pd.read_json(input_file)
+    # Load and validate the data (rejected rows and corrected answers are written to their own files)
+    if data is None:
+        data = load_survey_data(input_file, quarantine_file=os.path.join(output_folder, 'quarantined_rows.csv'),
+                                corrections_file=os.path.join(output_folder, 'corrected_values.csv'), writer=writer)
+
+    # Keep the respondents whose project ratings are valid
+    data = select_valid_rows(data, ['ratings'])
 
     # Filter columns that start with 'project_rating_'
     rating_columns = [col for col in data.columns if col.startswith('project_rating_')]
@@ -28,20 +47,16 @@ def majority_judgment_calculation(input_file='survey_data.json', output_folder='
     # Initialize a DataFrame to hold the rating counts for each project
     rating_counts = pd.DataFrame()
 
-    # Define the expected rating categories
-    expected_ratings = ['Inakzeptabel.', 'Akzeptabel.', 'Exzellent.']
+    # Define the expected rating categories (their positions are the rating codes)
+    expected_ratings = common_fields['project_ratings']
 
     # Calculate the count of each rating for each project
     for col in rating_columns:
         project_name = col.replace('project_rating_', '')  # Extract the project name
-        counts = data[col].value_counts(dropna=True)  # Count the occurrences of each rating, ignoring nulls
-        # Filter out any unexpected rating values
-        counts = counts[counts.index.isin(expected_ratings)]
-        # Ensure all expected ratings are present
-        for rating in expected_ratings:
-            if rating not in counts:
-                counts[rating] = 0
-        rating_counts[project_name] = counts
+        codes = data[col].to_numpy()
+        # Count the occurrences of each rating code, ignoring missing answers
+        counts = np.bincount(codes[codes != MISSING_CODE], minlength=len(expected_ratings))
+        rating_counts[project_name] = pd.Series(counts, index=expected_ratings)
 
     # Transpose the DataFrame for easier plotting
     rating_counts = rating_counts.T
@@ -49,8 +64,11 @@ def majority_judgment_calculation(input_file='survey_data.json', output_folder='
     # Ensure the output directory exists
     os.makedirs(output_folder, exist_ok=True)
 
-    # Save the results to the output folder
-    rating_counts.to_csv(os.path.join(output_folder, 'majority_judgment_results.csv'))
+    # Save the results to the output folder, keeping the published column order from best to worst rating
+    write_csv(rating_counts[expected_ratings[::-1]], os.path.join(output_folder, 'majority_judgment_results.csv'), writer)
+
+    # Keep the counts per project before the chart columns are added
+    majority_judgment_df = rating_counts[expected_ratings].rename_axis(index='Project', columns=None).reset_index()
 
     # Prepare data for Diverging Bar Chart
     rating_counts = rating_counts.fillna(0)  # Fill any remaining NaNs with 0
@@ -75,11 +93,17 @@ def majority_judgment_calculation(input_file='survey_data.json', output_folder='
                   color_discrete_map={'Positive': 'green', 'Negative': 'red'})
 
     # Save the Diverging Bar Chart as an HTML file
-    fig1.write_html(os.path.join(output_folder, 'majority_judgment_diverging_bar_chart.html'))
+    write_html(fig1, os.path.join(output_folder, 'majority_judgment_diverging_bar_chart.html'), writer)
+
+    # Queue the charts for static image export
+    if exporter is not None:
+        exporter.submit(fig1)
 
     # Display the plots (Optional for local testing)
     if showResults:
         fig1.show()
 
+    return majority_judgment_df
+
 # Example usage:
 # majority_judgment_calculation()
\ No newline at end of file
@@ -1,22 +1,39 @@
 import pandas as pd
 import os
 import plotly.express as px
+from analytics.validation import load_survey_data, select_valid_rows
+from analytics.codec import encode_labels
+from analytics.artifact_writer import write_csv, write_html
 
-def preference_approval_voting_calculation(input_file='survey_data.json', output_folder='analytics/scriptResults', showResults=False):
+def preference_approval_voting_calculation(input_file='survey_data.json', output_folder='analytics/scriptResults', showResults=False, data=None, exporter=None, writer=None):
     """
     This function performs a Preference Approval Voting calculation on survey data using project ratings.
 
     Parameters:
     input_file (str): The path to the JSON file containing the survey data.
     output_folder (str): The directory where the results will be saved.
+    showResults (bool): Whether to open the charts after saving them.
+    data (DataFrame): Survey data as returned by load_survey_data; when given, input_file is not read.
+    exporter (ImageExporter): Optional exporter that also renders the charts to PNG and SVG images.
+    writer (ArtifactWriter): Optional background writer for the CSV and HTML files (written synchronously otherwise).
 
     Outputs:
     - A CSV file with the approval scores for each project.
     - HTML files with a bar chart and stacked bar chart visualizing the approval scores.
+    - A CSV file with the rows rejected by validation and the reasons they were rejected.
+    - A CSV file with the answers corrected by validation and the reasons they were corrected.
+
+    Returns:
+    - A DataFrame with the approval scores and average ranks for each project.
     """
 
-    # Load the data
-    data = pd.read_json(input_file)
+    # Load and validate the data (rejected rows and corrected answers are written to their own files)
+    if data is None:
+        data = load_survey_data(input_file, quarantine_file=os.path.join(output_folder, 'quarantined_rows.csv'),
+                                corrections_file=os.path.join(output_folder, 'corrected_values.csv'), writer=writer)
+
+    # Keep the respondents whose project rankings and ratings are valid
+    data = select_valid_rows(data, ['ranks', 'ratings'])
 
     # Filter columns for preferences and ratings
     preference_columns = [col for col in data.columns if col.startswith('project_preference_')]
@@ -27,12 +44,8 @@ def preference_approval_voting_calculation(input_file='survey_data.json', output
     approval_breakdown = []
     average_ranks = {}
 
-    # Translate ratings to approvals
-    rating_to_approval = {
-        "Exzellent.": "Yes",
-        "Akzeptabel.": "Yes",
-        "Inakzeptabel.": "No"
-    }
+    # Ratings that count as an approval
+    approved_ratings = ["Exzellent.", "Akzeptabel."]
 
     # Calculate the approval score and average rank for each project
     for pref_col in preference_columns:
@@ -40,23 +53,23 @@ def preference_approval_voting_calculation(input_file='survey_data.json', output
         rating_col = f'project_rating_{project_name}'  # Corresponding rating column
 
         if rating_col in rating_columns:
-            # Map ratings to approvals
-            approvals = data[rating_col].map(rating_to_approval)
+            # Approvals are the rows whose rating code is one of the approved ratings
+            approvals = data[rating_col].isin(encode_labels(rating_col, approved_ratings))
 
-            # Count approvals only where approval is 'Yes'
-            valid_approvals = data.loc[approvals == 'Yes', pref_col].value_counts()
+            # Count approvals only for approving respondents
+            valid_approvals = data.loc[approvals, pref_col].value_counts()
 
             total_ranks = 0
             total_approvals = 0
 
             for rank, count in valid_approvals.items():
-                points = len(preference_columns) - int(rank) + 1  # Higher rank (closer to 1) gets more points
+                points = len(preference_columns) - rank + 1  # Higher rank (closer to 1) gets more points
                 if project_name not in approval_scores:
                     approval_scores[project_name] = 0
                 approval_scores[project_name] += points * count
 
                 # Calculate total rank and count for average rank calculation
-                total_ranks += int(rank) * count
+                total_ranks += rank * count
                 total_approvals += count
 
                 approval_breakdown.append({'Project': project_name, 'Rank': rank, 'Count': count})
@@ -86,7 +99,7 @@ def preference_approval_voting_calculation(input_file='survey_data.json', output
     os.makedirs(output_folder, exist_ok=True)
 
     # Save the results to the output folder
-    approval_scores_df.to_csv(os.path.join(output_folder, 'preference_approval_voting_results.csv'))
+    write_csv(approval_scores_df, os.path.join(output_folder, 'preference_approval_voting_results.csv'), writer)
 
     # Plotting with Plotly - Bar Chart
     fig_bar = px.bar(approval_scores_df,
@@ -96,7 +109,7 @@ def preference_approval_voting_calculation(input_file='survey_data.json', output
                      title='Chart 9: Preference Approval Voting Results: Approval Score per Project')
 
     # Save the bar chart as an HTML file
-    fig_bar.write_html(os.path.join(output_folder, 'preference_approval_voting_results_plot.html'))
+    write_html(fig_bar, os.path.join(output_folder, 'preference_approval_voting_results_plot.html'), writer)
 
     # Plotting with Plotly - Stacked Bar Chart with Average Rank Annotations
     fig_stacked_bar = px.bar(approval_breakdown_df,
@@ -116,12 +129,18 @@ def preference_approval_voting_calculation(input_file='survey_data.json', output
                                        showarrow=False, yshift=10, xanchor='center')
 
     # Save the stacked bar chart as an HTML file
-    fig_stacked_bar.write_html(os.path.join(output_folder, 'preference_approval_voting_results_stacked_bar_plot.html'))
+    write_html(fig_stacked_bar, os.path.join(output_folder, 'preference_approval_voting_results_stacked_bar_plot.html'), writer)
+
+    # Queue the charts for static image export
+    if exporter is not None:
+        exporter.submit(fig_bar, fig_stacked_bar)
 
     # Display the plots (Optional for local testing)
     if showResults:
         fig_bar.show()
         fig_stacked_bar.show()
 
+    return approval_scores_df
+
 # Example usage:
 # preference_approval_voting_calculation()
\ No newline at end of file
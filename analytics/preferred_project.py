@@ -3,23 +3,39 @@ import os
 import plotly.express as px
 import plotly.graph_objects as go
 from common_fields import common_fields  # Importing common_fields from common_fields.py
+from analytics.validation import load_survey_data, select_valid_rows
+from analytics.artifact_writer import write_csv, write_html
 
-def preferred_project_votes_calculation(input_file='survey_data.json', output_folder='analytics/scriptResults', showResults=False):
+def preferred_project_votes_calculation(input_file='survey_data.json', output_folder='analytics/scriptResults', showResults=False, data=None, exporter=None, writer=None):
     """
     This function calculates the vote counts for each preferred project from the survey data.
 
     Parameters:
     input_file (str): The path to the JSON file containing the survey data.
     output_folder (str): The directory where the results will be saved.
+    showResults (bool): Whether to open the charts after saving them.
+    data (DataFrame): Survey data as returned by load_survey_data; when given, input_file is not read.
+    exporter (ImageExporter): Optional exporter that also renders the charts to PNG and SVG images.
+    writer (ArtifactWriter): Optional background writer for the CSV and HTML files (written synchronously otherwise).
 
     Outputs:
     - A CSV file with the vote counts for each project.
     - An HTML file with a bar chart visualizing the vote counts.
     - An HTML file with a radar chart visualizing the vote distribution.
+    - A CSV file with the rows rejected by validation and the reasons they were rejected.
+    - A CSV file with the answers corrected by validation and the reasons they were corrected.
+
+    Returns:
+    - A DataFrame with the vote counts for each project.
     """
 
-    # Load the data
-    data = pd.read_json(input_file)
+    # Load and validate the data (rejected rows and corrected answers are written to their own files)
+    if data is None:
+        data = load_survey_data(input_file, quarantine_file=os.path.join(output_folder, 'quarantined_rows.csv'),
+                                corrections_file=os.path.join(output_folder, 'corrected_values.csv'), writer=writer)
+
+    # Keep the respondents whose preferred project answers are valid
+    data = select_valid_rows(data, ['preferred'])
 
     # Count the votes for each preferred project
     preferred_project_votes = data['preferred_project'].value_counts()
@@ -35,7 +51,7 @@ def preferred_project_votes_calculation(input_file='survey_data.json', output_fo
     os.makedirs(output_folder, exist_ok=True)
 
     # Save the results to the output folder
-    preferred_project_votes.to_csv(os.path.join(output_folder, 'preferred_project_votes.csv'))
+    write_csv(preferred_project_votes, os.path.join(output_folder, 'preferred_project_votes.csv'), writer)
 
     # Convert the Series to a DataFrame for better handling in Plotly
     preferred_project_votes_df = preferred_project_votes.reset_index()
@@ -48,7 +64,7 @@ def preferred_project_votes_calculation(input_file='survey_data.json', output_fo
                      title='Chart 11: Votes by Preferred Project')
 
     # Save the bar chart as an HTML file
-    fig_bar.write_html(os.path.join(output_folder, 'preferred_project_votes_plot.html'))
+    write_html(fig_bar, os.path.join(output_folder, 'preferred_project_votes_plot.html'), writer)
 
     # Prepare data for Radar Chart
     radar_chart_data = pd.concat([preferred_project_votes_df, preferred_project_votes_df.iloc[[0]]], ignore_index=True)
@@ -72,12 +88,18 @@ def preferred_project_votes_calculation(input_file='survey_data.json', output_fo
     )
 
     # Save the radar chart as an HTML file
-    fig_radar.write_html(os.path.join(output_folder, 'preferred_project_votes_radar_plot.html'))
+    write_html(fig_radar, os.path.join(output_folder, 'preferred_project_votes_radar_plot.html'), writer)
+
+    # Queue the charts for static image export
+    if exporter is not None:
+        exporter.submit(fig_bar, fig_radar)
 
     # Display the plots (Optional for local testing)
     if showResults:
         fig_bar.show()
         fig_radar.show()
 
+    return preferred_project_votes_df
+
 # Example usage:
 # preferred_project_votes_calculation()
\ No newline at end of file
@@ -1,22 +1,39 @@
 import pandas as pd
 import os
 import plotly.express as px
+from analytics.chart_scaling import box_plot
+from analytics.validation import load_survey_data, select_valid_rows
+from analytics.artifact_writer import write_csv, write_html
 
-def range_voting_calculation(input_file='survey_data.json', output_folder='analytics/scriptResults', showResults=False):
+def range_voting_calculation(input_file='survey_data.json', output_folder='analytics/scriptResults', showResults=False, data=None, exporter=None, writer=None):
     """
     This function performs a Range Voting calculation on survey data.
 
     Parameters:
     input_file (str): The path to the JSON file containing the survey data.
     output_folder (str): The directory where the results will be saved.
+    showResults (bool): Whether to open the charts after saving them.
+    data (DataFrame): Survey data as returned by load_survey_data; when given, input_file is not read.
+    exporter (ImageExporter): Optional exporter that also renders the charts to PNG and SVG images.
+    writer (ArtifactWriter): Optional background writer for the CSV and HTML files (written synchronously otherwise).
 
     Outputs:
     - A CSV file with the total scores for each project.
     - HTML files with a bar chart and box plot visualizing the range voting results.
+    - A CSV file with the rows rejected by validation and the reasons they were rejected.
+    - A CSV file with the answers corrected by validation and the reasons they were corrected.
+
+    Returns:
+    - A DataFrame with the total scores for each project.
     """
 
-    # Load the data
-    data = pd.read_json(input_file)
+    # Load and validate the data (rejected rows and corrected answers are written to their own files)
+    if data is None:
+        data = load_survey_data(input_file, quarantine_file=os.path.join(output_folder, 'quarantined_rows.csv'),
+                                corrections_file=os.path.join(output_folder, 'corrected_values.csv'), writer=writer)
+
+    # Keep the respondents whose opinion ratings are valid
+    data = select_valid_rows(data, ['opinions'])
 
     # Filter columns that start with 'opinion_' and end with '_rating'
     rating_columns = [col for col in data.columns if col.startswith('opinion_') and col.endswith('_rating')]
@@ -41,7 +58,7 @@ def range_voting_calculation(input_file='survey_data.json', output_folder='analy
     os.makedirs(output_folder, exist_ok=True)
 
     # Save the results to the output folder
-    total_scores_df.to_csv(os.path.join(output_folder, 'range_voting_results.csv'))
+    write_csv(total_scores_df, os.path.join(output_folder, 'range_voting_results.csv'), writer)
 
     # Plotting with Plotly - Bar Chart
     fig_bar = px.bar(total_scores_df,
@@ -51,26 +68,33 @@ def range_voting_calculation(input_file='survey_data.json', output_folder='analy
                      title='Chart 13: Range Voting Results: Total Score per Project')
 
     # Save the bar chart as an HTML file
-    fig_bar.write_html(os.path.join(output_folder, 'range_voting_results_plot.html'))
+    write_html(fig_bar, os.path.join(output_folder, 'range_voting_results_plot.html'), writer)
 
     # Plotting with Plotly - Box Plot
     # Reshape the data for the box plot
     reshaped_data = pd.melt(data[rating_columns], var_name='Project', value_name='Score')
     reshaped_data['Project'] = reshaped_data['Project'].str.replace('opinion_', '').str.replace('_rating', '')
 
-    fig_box = px.box(reshaped_data,
-                     x='Project',
-                     y='Score',
-                     labels={'Project': 'Project', 'Score': 'Score'},
-                     title='Chart 14: Range Voting Results: Score Distribution per Project')
+    # Precomputed quartiles are used for large electorates
+    fig_box = box_plot(reshaped_data,
+                       x='Project',
+                       y='Score',
+                       labels={'Project': 'Project', 'Score': 'Score'},
+                       title='Chart 14: Range Voting Results: Score Distribution per Project')
 
     # Save the box plot as an HTML file
-    fig_box.write_html(os.path.join(output_folder, 'range_voting_results_box_plot.html'))
+    write_html(fig_box, os.path.join(output_folder, 'range_voting_results_box_plot.html'), writer)
+
+    # Queue the charts for static image export
+    if exporter is not None:
+        exporter.submit(fig_bar, fig_box)
 
     # Display the plots (Optional for local testing)
     if showResults:
         fig_bar.show()
         fig_box.show()
 
+    return total_scores_df
+
 # Example usage:
 # range_voting_calculation()
\ No newline at end of file